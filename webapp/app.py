@@ -1,14 +1,16 @@
 import json
 import os
+import queue
+import threading
+import uuid
 import zipfile
 from datetime import datetime
-from io import BytesIO
 from zoneinfo import ZoneInfo
 
-import pandas as pd
 from dotenv import load_dotenv
 from flask import (
     Flask,
+    Response,
     redirect,
     render_template,
     request,
@@ -27,6 +29,156 @@ load_dotenv()
 # Set the secret key from the environment variable
 app.secret_key = os.environ.get("FLASK_SECRET_KEY", "default_secret_key")
 
+# US/Pacific timezone for output names, resolved once instead of per request
+PACIFIC_TZ = ZoneInfo("America/Los_Angeles")
+
+# directory where uploaded CSVs are persisted for the background worker
+upload_dir = "/app/data/uploads"
+os.makedirs(upload_dir, exist_ok=True)
+
+# in-process job registry: each submission gets a job id, a progress queue
+# consumed by the /progress SSE route, and a result slot filled by the worker.
+# only the job id goes into the session cookie; results stay server-side
+jobs = {}
+job_queue = queue.Queue()
+
+# cap on registered jobs - the oldest entries are evicted as new jobs arrive
+max_jobs = 128
+
+
+def run_job(job_id, upload_path, submitter, filename_no_ext, formatted_time):
+    """
+    Runs the full primer design pipeline for one submission in the background worker.
+
+    Processes the uploaded CSV, loads the MySQL database, and writes the results
+    zip file, pushing progress messages onto the job's progress queue along the way.
+    Stores the outcome (results for display, or an error message) in the job's
+    result slot, and finishes with a terminal "done" or "error" progress message.
+
+    Parameters:
+    - job_id (str): The UUID identifying the job in the jobs registry.
+    - upload_path (str): Path to the persisted upload CSV.
+    - submitter (str): The name of the user submitting the job.
+    - filename_no_ext (str): The upload filename without extension.
+    - formatted_time (str): Submission timestamp used in output file names.
+    """
+    job = jobs[job_id]
+    progress = job["progress"]
+
+    try:
+        # process csv file object, return both input and output dfs
+        progress.put({"stage": "Processing CSV & designing primers", "pct": 10})
+        with open(upload_path, "rb") as file_object:
+            result = primer_designer.process_csv(file_object)
+
+        # handle cases of invalid input, store the error message as the result
+        input_valid = result[0]
+        if input_valid == False:
+            # in this case, error_message_str stored in second return value
+            job["result"] = {"error": result[1]}
+            progress.put({"stage": "error", "pct": 100})
+            return
+
+        _, input_df, all_options_ranked_df, optimal_primer_results_df = result
+
+        # load the MySQL database
+        progress.put({"stage": "Loading database", "pct": 50})
+        database_load_valid, databse_load_message = load_database.load_database(
+            submitter=submitter,
+            submission_name=filename_no_ext,
+            input_df=input_df,
+            output_df=all_options_ranked_df,
+        )
+
+        # handle cases of invalid dabatase load, store the error message as the result
+        if database_load_valid == False:
+            job["result"] = {"error": databse_load_message}
+            progress.put({"stage": "error", "pct": 100})
+            return
+
+        # create zip file name and path variables
+        zip_file_name = f"{formatted_time}_{filename_no_ext}.zip"
+        zip_file_path = f"/app/data/{zip_file_name}"
+
+        # create a ZipFile object writing straight to the Docker volume,
+        # streaming each CSV into its entry without an in-memory copy.
+        # compresslevel=1 keeps the job responsive - the CSVs are
+        # highly compressible text, so higher levels buy little ratio
+        progress.put({"stage": "Writing results zip", "pct": 80})
+        with zipfile.ZipFile(
+            zip_file_path, "w", zipfile.ZIP_DEFLATED, compresslevel=1
+        ) as zip_file:
+            # write input CSV to the zip file
+            with zip_file.open(
+                f"{formatted_time}_{filename_no_ext}_input.csv", "w"
+            ) as zip_entry:
+                input_df.to_csv(zip_entry, index=False)
+            # write all_options_ranked_df CSV to the zip file
+            with zip_file.open(
+                f"{formatted_time}_{filename_no_ext}_all_options_ranked.csv", "w"
+            ) as zip_entry:
+                all_options_ranked_df.to_csv(zip_entry, index=False)
+            # write optimal_primer_results_df CSV to the zip file
+            with zip_file.open(
+                f"{formatted_time}_{filename_no_ext}_optimal_primer_results.csv",
+                "w",
+            ) as zip_entry:
+                optimal_primer_results_df.to_csv(zip_entry, index=False)
+
+        # subset columns to simplify table returned to html webapp
+        primer_results_for_display = optimal_primer_results_df[
+            [
+                "primer_name",
+                "direction",
+                "primer_sequence",
+                "length",
+                "melt_temperature",
+                "gc_percentage",
+                "gc_clamp",
+            ]
+        ]
+
+        # store variables for the 'success' route in the job result slot -
+        # the DataFrame is kept as-is, no JSON round-trip needed
+        job["result"] = {
+            "primer_results_for_display": primer_results_for_display,
+            "file_created": True,
+            "file_path": zip_file_path,
+            "result_file_name": zip_file_name,
+        }
+        progress.put({"stage": "done", "pct": 100})
+    except Exception as exception:
+        job["result"] = {"error": str(exception)}
+        progress.put({"stage": "error", "pct": 100})
+    finally:
+        # clean up the persisted upload once the job is finished
+        try:
+            os.remove(upload_path)
+        except OSError:
+            pass
+
+
+def worker_loop():
+    """
+    Consumes submitted jobs from the job queue and runs them one at a time.
+
+    Runs forever on the daemon worker thread started at module import, so
+    primer design work never blocks the Flask request threads.
+    """
+    while True:
+        job_args = job_queue.get()
+        try:
+            run_job(*job_args)
+        except Exception:
+            # never let a single bad job take down the worker thread
+            app.logger.exception("background job failed")
+        job_queue.task_done()
+
+
+# start the background worker thread at module import
+worker_thread = threading.Thread(target=worker_loop, daemon=True)
+worker_thread.start()
+
 
 @app.route("/", methods=["GET", "POST"])
 def home():
@@ -34,20 +186,20 @@ def home():
     Flask route handler for the home page.
 
     Supports both GET and POST requests. For GET requests, renders the home page.
-    For POST requests, processes the uploaded CSV file, creates a zip file containing
-    input and output CSVs, adds submission details to a MySQL database, and renders
-    the success or error page with relevant results or error message information.
+    For POST requests, validates the uploaded CSV file, persists it to disk, and
+    enqueues a background job that designs primers, loads the MySQL database, and
+    writes the results zip file. Responds immediately with a processing page that
+    follows job progress over SSE and redirects to the success page when done.
 
     Returns:
     - GET request: Rendered HTML template for the home page.
     - POST request:
-        - Rendered HTML template with an error message if the file extension is not .csv or
-          if the CSV processing encounters an error.
-        - Renders the "success.html" template with processed input and output DataFrames if successful,
-          and stores details in a MySQL database.
+        - Rendered HTML template with an error message if the file extension is not .csv.
+        - Rendered "processing.html" template tracking the enqueued job otherwise.
 
     Note:
-    - Uses Flask session to store variables for the "success" route to avoid resubmitting the POST request on refresh.
+    - Uses Flask session to store the job id for the "success" route, so results
+      survive a refresh without resubmitting the POST request.
     """
 
     # run this block upon "POST" request from CSV upload
@@ -70,120 +222,118 @@ def home():
                 return render_template("error.html", message=error_message_str)
 
             # get current time (US/Pacific) & format for output names
-            current_time = datetime.now(ZoneInfo("America/Los_Angeles"))
+            current_time = datetime.now(PACIFIC_TZ)
             formatted_time = current_time.strftime("%Y-%m-%d_%H-%M-%S")
-            # create zip file name and path variables
-            zip_file_name = f"{formatted_time}_{filename_no_ext}.zip"
-            zip_file_path = f"/app/data/{zip_file_name}"
-
-            # process csv file object, return both input and output dfs
-            (
-                input_valid,
-                input_df,
-                all_options_ranked_df,
-                optimal_primer_results_df,
-            ) = primer_designer.process_csv(file)
-
-            # handle cases of invalid input, direct user to the error message page
-            if input_valid == False:
-                # in this case, error_message_str stored in input_df variable
-                return render_template("error.html", message=input_df)
-
-            # load the MySQL database
-            database_load_valid, databse_load_message = load_database.load_database(
-                submitter=submitter,
-                submission_name=filename_no_ext,
-                input_df=input_df,
-                output_df=all_options_ranked_df,
-            )
-
-            # handle cases of invalid dabatase load, direct user to the error message page
-            if database_load_valid == False:
-                return render_template("error.html", message=databse_load_message)
-
-            # create BytesIO object to store the zip file in memory
-            zip_buffer = BytesIO()
-
-            # create a ZipFile object
-            with zipfile.ZipFile(
-                zip_buffer, "a", zipfile.ZIP_DEFLATED, False
-            ) as zip_file:
-                # write input CSV to the zip file
-                zip_file.writestr(
-                    f"{formatted_time}_{filename_no_ext}_input.csv",
-                    input_df.to_csv(index=False),
-                )
-                # write all_options_ranked_df CSV to the zip file
-                zip_file.writestr(
-                    f"{formatted_time}_{filename_no_ext}_all_options_ranked.csv",
-                    all_options_ranked_df.to_csv(index=False),
-                )
-                # write optimal_primer_results_df CSV to the zip file
-                zip_file.writestr(
-                    f"{formatted_time}_{filename_no_ext}_optimal_primer_results.csv",
-                    optimal_primer_results_df.to_csv(index=False),
-                )
 
-            # move buffer position to the beginning to prepare for reading
-            zip_buffer.seek(0)
-            # write the zip file to the Docker volume
-            with open(zip_file_path, "wb") as zip_file:
-                zip_file.write(zip_buffer.read())
-
-            # subset columns to simplify table returned to html webapp
-            primer_results_for_display = optimal_primer_results_df[
-                [
-                    "primer_name",
-                    "direction",
-                    "primer_sequence",
-                    "length",
-                    "melt_temperature",
-                    "gc_percentage",
-                    "gc_clamp",
+            # persist the upload so the background worker can read it
+            # after this request ends
+            job_id = uuid.uuid4().hex
+            upload_path = os.path.join(upload_dir, f"{job_id}.csv")
+            file.save(upload_path)
+
+            # register the job and hand it to the background worker, evicting
+            # the oldest finished jobs to keep the registry bounded - queued
+            # and running jobs (result still None) are never evicted
+            jobs[job_id] = {"progress": queue.Queue(), "result": None}
+            if len(jobs) > max_jobs:
+                finished_job_ids = [
+                    finished_id
+                    for finished_id, job in jobs.items()
+                    if job["result"] is not None
                 ]
-            ]
+                for finished_id in finished_job_ids[: len(jobs) - max_jobs]:
+                    jobs.pop(finished_id)
+            job_queue.put((job_id, upload_path, submitter, filename_no_ext, formatted_time))
 
-            # store variables for 'success' route in session
-            session["primer_results_for_display"] = primer_results_for_display.to_json()
-            session["file_created"] = True
-            session["file_path"] = zip_file_path
-            session["result_file_name"] = zip_file_name
+            # store the job id for the 'success' route in session
+            session["job_id"] = job_id
 
-            # redirect to success route to display results, and avoid resubmitting post request on refresh
-            return redirect(url_for("success"))
+            # render the processing page, which follows job progress via SSE
+            # and redirects to the success route when the job finishes
+            return render_template("processing.html", job_id=job_id)
 
     return render_template("index.html")
 
 
+@app.route("/progress/<job_id>")
+def progress(job_id):
+    """
+    Flask route handler streaming job progress as server-sent events (SSE).
+
+    Yields one "data:" event per progress message pushed by the background
+    worker, with heartbeat comments while the job is quiet so proxies don't
+    drop the connection. The stream closes after the terminal "done" or
+    "error" message.
+
+    Parameters:
+    - job_id (str): The UUID identifying the job in the jobs registry.
+
+    Returns:
+    - Response: A text/event-stream response, or a 404 for unknown job ids.
+    """
+    job = jobs.get(job_id)
+    if job is None:
+        return "Unknown job id", 404
+
+    def event_stream():
+        while True:
+            try:
+                message = job["progress"].get(timeout=15)
+            except queue.Empty:
+                # heartbeat comment keeps the connection alive through proxies
+                yield ": heartbeat\n\n"
+                continue
+            yield f"data: {json.dumps(message)}\n\n"
+            if message["stage"] in ("done", "error"):
+                break
+
+    return Response(event_stream(), mimetype="text/event-stream")
+
+
 @app.route("/success")
 def success():
     """
     Flask route handler for the success page.
 
-    Renders the "success.html" template, displaying the results of the primer design process
-    and information stored in the Flask session from the previous "home" route.
+    Renders the "success.html" template, displaying the results of the primer
+    design job identified by the job id stored in the Flask session from the
+    previous "home" route.
 
     Returns:
     - Rendered HTML template:
         - Displays tables with primer design results.
         - Indicates whether the file was successfully created.
         - Provides a link to download the results zip file.
+        - Renders the error page instead if the job failed.
+        - Redirects home if there is no finished job for this session.
 
     Note:
-    - Retrieves stored variables from the Flask session to display relevant information.
+    - Retrieves the job result from the in-process jobs registry.
     """
-    # retrieve variables from session
-    primer_results_for_display = pd.DataFrame(
-        json.loads(session["primer_results_for_display"])
-    )
-    file_created = session["file_created"]
-    file_path = session["file_path"]
-    result_file_name = session["result_file_name"]
-
-    # render index.html file, sending all relevant outputs and variables
+    # look up the job for this session in the registry
+    job_id = session.get("job_id")
+    job = jobs.get(job_id)
+    if job is None or job["result"] is None:
+        return redirect(url_for("home"))
+
+    result = job["result"]
+
+    # handle cases where the background job failed, direct user to the error message page
+    if "error" in result:
+        return render_template("error.html", message=result["error"])
+
+    # retrieve results for display from the job result
+    primer_results_for_display = result["primer_results_for_display"]
+    file_created = result["file_created"]
+    file_path = result["file_path"]
+    result_file_name = result["result_file_name"]
+
+    # render success.html, letting the template iterate the result rows
+    # directly - avoids materializing a large to_html string server-side
     return render_template(
         "success.html",
-        tables=[primer_results_for_display.to_html(classes="data")],
+        columns=list(primer_results_for_display.columns),
+        rows=list(primer_results_for_display.itertuples(index=False, name=None)),
         file_created=file_created,
         file_path=file_path,
         result_file_name=result_file_name,
@@ -1,7 +1,6 @@
 import os
 
-import mysql.connector
-import pandas as pd
+from mysql.connector import pooling
 from dotenv import load_dotenv
 
 # load mysql db secrets from .env
@@ -10,6 +9,39 @@ MYSQL_USER = os.getenv("MYSQL_USER")
 MYSQL_PASSWORD = os.getenv("MYSQL_PASSWORD")
 MYSQL_DATABASE = os.getenv("MYSQL_DATABASE")
 
+# validate the .env configuration once at import instead of on every call
+ENV_VALID = all(
+    isinstance(env_var, str) and env_var != ""
+    for env_var in [MYSQL_USER, MYSQL_PASSWORD, MYSQL_DATABASE]
+)
+
+# connection pool shared across submissions, so each load checks out a warm
+# connection instead of paying the TCP + auth handshake per request.
+# created on first use so a bad .env surfaces as an error page, not an
+# import failure
+connection_pool = None
+
+
+def get_connection_pool():
+    """
+    Returns the shared MySQL connection pool, creating it on first use.
+
+    Returns:
+    - MySQLConnectionPool: The module-wide connection pool.
+    """
+    global connection_pool
+    if connection_pool is None:
+        connection_pool = pooling.MySQLConnectionPool(
+            pool_name="primers",
+            pool_size=8,
+            host="mysql",
+            user=MYSQL_USER,
+            password=MYSQL_PASSWORD,
+            database=MYSQL_DATABASE,
+            autocommit=False,
+        )
+    return connection_pool
+
 
 def load_database(submitter, submission_name, input_df, output_df):
     """
@@ -28,113 +60,126 @@ def load_database(submitter, submission_name, input_df, output_df):
           returns (False, error_message_str).
 
     Notes:
-    - The function checks the .env file for correct configuration of MySQL user, password, and database name.
-    - Connects to a MySQL database using provided credentials.
+    - The .env file configuration of MySQL user, password, and database name is validated once at import.
+    - Checks out a connection from the shared pool, and returns it when done.
     - Inserts submission details into the 'submissions' table.
     - Inserts amplicon information into the 'amplicons' table.
     - Merges input and output DataFrames to obtain amplicon ID and inserts primer options into the 'primers_all_options' table.
-    - The database connection is automatically committed at the end of each transaction.
+    - All inserts run in a single transaction, committed once at the end and rolled back on error.
     """
 
     # check that .env file has been configured correctly
-    try:
-        for env_var in [MYSQL_USER, MYSQL_PASSWORD, MYSQL_DATABASE]:
-            assert env_var != None
-            assert env_var != ""
-            assert type(env_var) == str
-    except:
+    if not ENV_VALID:
         error_message_str = f"""Error in .env file configuration!
         Environtment variables MYSQL_USER, MYSQL_PASSWORD, MYSQL_DATABASE must be set
         as valid values in .env file in project directory."""
         return False, error_message_str
 
-    # connect to MySQL database
-    mydb = mysql.connector.connect(
-        host="mysql",
-        user=MYSQL_USER,
-        password=MYSQL_PASSWORD,
-        database=MYSQL_DATABASE,
-    )
+    # check out a pooled MySQL connection (returned to the pool on close)
+    mydb = get_connection_pool().get_connection()
     mycursor = mydb.cursor()
 
-    # add record to submissions table
-    sql = "INSERT INTO submissions (submitter, submission_name) VALUES (%s, %s)"
-    val = (submitter, submission_name)
-    mycursor.execute(sql, val)
-    mydb.commit()
-
-    # add records to amplicons table
-    submission_id = mycursor.lastrowid
-    inputs_vals = []
-
-    for index, row in input_df.iterrows():
-        inputs_vals.append((submission_id, row["amplicon name"], row["sequence"]))
-
-    inputs_sql = "INSERT INTO amplicons (submission_id, amplicon_name, DNA_sequence) VALUES (%s, %s, %s)"
-    mycursor.executemany(inputs_sql, inputs_vals)
-    mydb.commit()
-
-    # TODO: add amplicon sequence or amplicon name to output df to merge amplicon ID to primer options
-    # add records to primers_all_options table
-    mycursor.execute(f"SELECT * FROM amplicons WHERE submission_id = {submission_id}")
-    inputs_rows = mycursor.fetchall()
-    inputs_rows_df = pd.DataFrame(
-        inputs_rows,
-        columns=["amplicon_id", "submission_id", "amplicon_name", "DNA_sequence"],
-    )
-
-    merged_amplicons_output_df = output_df.merge(
-        inputs_rows_df, how="left", on="amplicon_name"
-    )
-
-    outputs_vals = list(
-        zip(
-            [float(submission_id)] * len(merged_amplicons_output_df),
-            merged_amplicons_output_df["amplicon_id"].astype(float).values,
-            merged_amplicons_output_df["primer_name"].values,
-            merged_amplicons_output_df["direction"].values,
-            merged_amplicons_output_df["option_group_index"].astype(float).values,
-            merged_amplicons_output_df["primer_sequence"].values,
-            merged_amplicons_output_df["gc_clamp"].astype(float).values,
-            merged_amplicons_output_df["length"].astype(float).values,
-            merged_amplicons_output_df["gc_percentage"].astype(float).values,
-            merged_amplicons_output_df["melt_temperature"].astype(float).values,
-            merged_amplicons_output_df["melt_temp_target_distance"]
-            .astype(float)
-            .values,
-            merged_amplicons_output_df["gc_percentage_target_distance"]
-            .astype(float)
-            .values,
-            merged_amplicons_output_df["melt_temperature_score"].astype(float).values,
-            merged_amplicons_output_df["gc_percentage_score"].astype(float).values,
-            merged_amplicons_output_df["total_score"].astype(float).values,
-            merged_amplicons_output_df["option_group_rank"].astype(float).values,
+    # run all three inserts in a single transaction with one commit at the
+    # end, so InnoDB flushes the redo log once instead of once per table
+    try:
+        # add record to submissions table
+        sql = "INSERT INTO submissions (submitter, submission_name) VALUES (%s, %s)"
+        val = (submitter, submission_name)
+        mycursor.execute(sql, val)
+
+        # add records to amplicons table
+        submission_id = mycursor.lastrowid
+        inputs_vals = list(
+            zip(
+                [submission_id] * len(input_df),
+                input_df["amplicon name"].values,
+                input_df["sequence"].values,
+            )
         )
-    )
-    outputs_sql = """
-    INSERT INTO primers_all_options (
-        submission_id, 
-        amplicon_id, 
-        primer_name, 
-        direction,
-        option_group_index,
-        primer_sequence,
-        gc_clamp,
-        `length`,
-        gc_percentage,
-        melt_temperature,
-        melt_temp_target_distance,
-        gc_percentage_target_distance,
-        melt_temperature_score,
-        gc_percentage_score,
-        total_score,
-        option_group_rank)
-    VALUES (%s, %s, %s, %s, 
-            %s, %s, %s, %s,
-            %s, %s, %s, %s,
-            %s, %s, %s, %s)
-    """
-    mycursor.executemany(outputs_sql, outputs_vals)
-    mydb.commit()
+
+        inputs_sql = "INSERT INTO amplicons (submission_id, amplicon_name, DNA_sequence) VALUES (%s, %s, %s)"
+        mycursor.executemany(inputs_sql, inputs_vals)
+
+        # add records to primers_all_options table
+        # the multi-row amplicons INSERT assigns a contiguous auto-increment block,
+        # so each amplicon_id follows sequentially from the first inserted row -
+        # no SELECT round-trip needed to recover the ids
+        first_amplicon_id = mycursor.lastrowid
+        amplicon_id_map = dict(
+            zip(
+                input_df["amplicon name"],
+                range(first_amplicon_id, first_amplicon_id + len(input_df)),
+            )
+        )
+        merged_amplicons_output_df = output_df.copy()
+        merged_amplicons_output_df["amplicon_id"] = merged_amplicons_output_df[
+            "amplicon_name"
+        ].map(amplicon_id_map)
+
+        # build the insert tuples column-wise, casting numeric columns to float
+        # so the connector receives native-convertible values
+        outputs_df = merged_amplicons_output_df[
+            [
+                "amplicon_id",
+                "primer_name",
+                "direction",
+                "option_group_index",
+                "primer_sequence",
+                "gc_clamp",
+                "length",
+                "gc_percentage",
+                "melt_temperature",
+                "melt_temp_target_distance",
+                "gc_percentage_target_distance",
+                "melt_temperature_score",
+                "gc_percentage_score",
+                "total_score",
+                "option_group_rank",
+            ]
+        ].copy()
+        numeric_columns = outputs_df.columns.drop(
+            ["primer_name", "direction", "primer_sequence"]
+        )
+        outputs_df[numeric_columns] = outputs_df[numeric_columns].astype(float)
+        outputs_df.insert(0, "submission_id", float(submission_id))
+        outputs_vals = list(outputs_df.itertuples(index=False, name=None))
+        outputs_sql = """
+        INSERT INTO primers_all_options (
+            submission_id, 
+            amplicon_id, 
+            primer_name, 
+            direction,
+            option_group_index,
+            primer_sequence,
+            gc_clamp,
+            `length`,
+            gc_percentage,
+            melt_temperature,
+            melt_temp_target_distance,
+            gc_percentage_target_distance,
+            melt_temperature_score,
+            gc_percentage_score,
+            total_score,
+            option_group_rank)
+        VALUES (%s, %s, %s, %s, 
+                %s, %s, %s, %s,
+                %s, %s, %s, %s,
+                %s, %s, %s, %s)
+        """
+        # insert in large batches - each executemany call builds one extended
+        # multi-row INSERT, so chunking keeps the statement size bounded
+        batch_size = 10000
+        for batch_start in range(0, len(outputs_vals), batch_size):
+            mycursor.executemany(
+                outputs_sql, outputs_vals[batch_start : batch_start + batch_size]
+            )
+
+        mydb.commit()
+    except Exception:
+        mydb.rollback()
+        raise
+    finally:
+        # return the connection to the pool
+        mydb.close()
 
     return True, "Database load successful"
@@ -1,93 +1,62 @@
-from io import StringIO
-
 import numpy as np
 import pandas as pd
-from Bio.Seq import Seq
+
+# prefer the PyArrow CSV reader when available - it parses faster than the C
+# engine and backs string columns with Arrow buffers instead of Python objects
+try:
+    import pyarrow  # noqa: F401
+
+    CSV_READ_KWARGS = {"engine": "pyarrow", "dtype_backend": "pyarrow"}
+except ImportError:
+    CSV_READ_KWARGS = {}
 
 # Define Function for calculating Modified Breslauer Melting Temperature (same algorithm as benchling)
 # https://www.ncbi.nlm.nih.gov/pmc/articles/PMC323600/pdf/pnas00315-0187.pdf - original paper for algorithm and thermo quantities
 # http://biotools.nubic.northwestern.edu/OligoCalc2.01.html - reference link for equation
 
-# Dataframe of nearest nieghbor thermodynamic quantities. Used in the tm_calc() function
-energies = pd.DataFrame.from_dict(
-    {
-        "Pair": [
-            "AA",
-            "AT",
-            "AG",
-            "AC",
-            "TT",
-            "TA",
-            "TG",
-            "TC",
-            "GG",
-            "GC",
-            "GA",
-            "GT",
-            "CC",
-            "CG",
-            "CA",
-            "CT",
-        ],
-        "H": [
-            9.1,
-            8.6,
-            7.8,
-            6.5,
-            9.1,
-            6,
-            5.8,
-            5.6,
-            11,
-            11.1,
-            5.6,
-            6.5,
-            11,
-            11.9,
-            5.8,
-            7.8,
-        ],
-        "S": [
-            24,
-            23.9,
-            20.8,
-            17.3,
-            24,
-            16.9,
-            12.9,
-            13.5,
-            26.6,
-            26.7,
-            13.5,
-            17.3,
-            26.6,
-            27.8,
-            12.9,
-            20.8,
-        ],
-        "G": [
-            1.9,
-            1.5,
-            1.6,
-            1.3,
-            1.9,
-            0.9,
-            1.9,
-            1.6,
-            3.1,
-            3.1,
-            1.6,
-            1.3,
-            3.1,
-            3.6,
-            1.9,
-            1.6,
-        ],
-    }
-)
-
-# set the pair column as the dataframe index
-energies.set_index("Pair", inplace=True)
+# Nearest nieghbor thermodynamic quantities (H, S, G) per dinucleotide pair. Used in the tm_calc() function
+energies = {
+    "AA": (9.1, 24, 1.9),
+    "AT": (8.6, 23.9, 1.5),
+    "AG": (7.8, 20.8, 1.6),
+    "AC": (6.5, 17.3, 1.3),
+    "TT": (9.1, 24, 1.9),
+    "TA": (6, 16.9, 0.9),
+    "TG": (5.8, 12.9, 1.9),
+    "TC": (5.6, 13.5, 1.6),
+    "GG": (11, 26.6, 3.1),
+    "GC": (11.1, 26.7, 3.1),
+    "GA": (5.6, 13.5, 1.6),
+    "GT": (6.5, 17.3, 1.3),
+    "CC": (11, 26.6, 3.1),
+    "CG": (11.9, 27.8, 3.6),
+    "CA": (5.8, 12.9, 1.9),
+    "CT": (7.8, 20.8, 1.6),
+}
+
+# lookup table mapping nucleotide ASCII codes to 0-3 (A=0, C=1, G=2, T=3),
+# so a dinucleotide pair packs into the index 4 * first_base + second_base.
+# every other byte maps to an out-of-range sentinel, so indexing the
+# thermodynamic tables with an ambiguous base (e.g. N) raises instead of
+# silently scoring it as A
+NON_ACGT_SENTINEL = 16
+BASE_CODE_LUT = np.full(256, NON_ACGT_SENTINEL, dtype=np.intp)
+for _code, _base in enumerate(b"ACGT"):
+    BASE_CODE_LUT[_base] = _code
+
+# length-16 lookup tables of H, S, G values indexed by packed dinucleotide pair,
+# so tm_calc() can sum energies with NumPy fancy indexing instead of per-pair lookups
+H_TABLE = np.zeros(16, dtype=np.float64)
+S_TABLE = np.zeros(16, dtype=np.float64)
+G_TABLE = np.zeros(16, dtype=np.float64)
+for _pair, (_h, _s, _g) in energies.items():
+    _idx = 4 * BASE_CODE_LUT[ord(_pair[0])] + BASE_CODE_LUT[ord(_pair[1])]
+    H_TABLE[_idx] = _h
+    S_TABLE[_idx] = _s
+    G_TABLE[_idx] = _g
+
+# translation table for complementing a DNA sequence as raw bytes
+RC_TRANSLATION = bytes.maketrans(b"ACGTN", b"TGCAN")
 
 
 def tm_calc(seq):
@@ -107,20 +76,15 @@ def tm_calc(seq):
       https://www.ncbi.nlm.nih.gov/pmc/articles/PMC323600/pdf/pnas00315-0187.pdf
     - Reference link for the equation: http://biotools.nubic.northwestern.edu/OligoCalc2.01.html
     """
-    h_tot = 0
-    s_tot = 0
-    g_tot = 0
-
-    for i in range(len(seq)):
-        if i + 2 <= len(seq):
-            pair = seq[i : i + 2]
-            h = energies.loc[pair, "H"]
-            s = energies.loc[pair, "S"]
-            g = energies.loc[pair, "G"]
+    # encode the sequence to 0-3 base codes, then pack each overlapping
+    # dinucleotide pair into an index for the thermodynamic lookup tables
+    arr = np.frombuffer(seq.encode("ascii"), dtype=np.uint8)
+    codes = BASE_CODE_LUT[arr]
+    pair_idx = codes[:-1] * 4 + codes[1:]
 
-            h_tot += h
-            s_tot += s
-            g_tot += g
+    h_tot = H_TABLE[pair_idx].sum()
+    s_tot = S_TABLE[pair_idx].sum()
+    g_tot = G_TABLE[pair_idx].sum()
 
     numerator = h_tot - 3.4
     denominator = (s_tot / 1000) + 0.0019872 * np.log(1 / 0.25e-7)
@@ -129,6 +93,40 @@ def tm_calc(seq):
     return t
 
 
+def expand_duplicate_amplicons(results_df, input_df, representative_names):
+    """
+    Replicates scored primer results from representative amplicons onto duplicates.
+
+    Parameters:
+    - results_df (DataFrame): Results scored on distinct sequences only.
+    - input_df (DataFrame): The full submitted input, possibly with repeated sequences.
+    - representative_names (dict): Maps each sequence to the amplicon name it was scored under.
+
+    Returns:
+    - DataFrame: Results covering every submitted amplicon, sorted by primer group.
+    """
+    results_by_name = {
+        name: group for name, group in results_df.groupby("amplicon_name")
+    }
+
+    relabeled_results = []
+    for name, sequence in input_df[["amplicon name", "sequence"]].itertuples(
+        index=False, name=None
+    ):
+        group = results_by_name[representative_names[sequence]].copy()
+        group["amplicon_name"] = name
+        group["primer_name"] = name + " " + group["direction"].astype(str)
+        relabeled_results.append(group)
+
+    expanded_df = pd.concat(relabeled_results, ignore_index=True)
+    expanded_df = expanded_df.astype(
+        {"amplicon_name": "category", "primer_name": "category"}
+    )
+    return expanded_df.sort_values(
+        ["primer_name", "option_group_rank"], ignore_index=True
+    )
+
+
 def generate_primers(
     input_df, add_overhangs=False, upstream_overhang=None, downstream_overhang=None
 ):
@@ -146,9 +144,6 @@ def generate_primers(
         - all_options_ranked_df (DataFrame): DataFrame containing all scored & ranked primer options.
         - optimal_primer_results_df (DataFrame): DataFrame containing the subset of optimal primers from each option group.
     """
-    # convert column headers to lowercase to avoid case sensitivity errors
-    input_df.columns = map(str.lower, input_df.columns)
-
     # clean up sequences - remove spaces & new line characters, make uppercase
     input_df["sequence"] = (
         input_df["sequence"]
@@ -158,51 +153,43 @@ def generate_primers(
         .str.upper()
     )
 
+    # score each distinct sequence once - repeated sequences (replicates, QC
+    # duplicates) reuse the scored options of the first amplicon carrying them
+    unique_input_df = input_df.drop_duplicates("sequence")
+
     # Create dataframe to hold all primer options
-    # for each amplicon list of possible forward & reverse primers b/w 19-26 bp
-    options_tuples_list = []
-    for index, row in input_df.iterrows():
-
-        forward_options = []
-        reverse_options = []
-
-        forward_name = f"{row['amplicon name']} forward"
-        reverse_name = f"{row['amplicon name']} reverse"
-
-        option_group_idx_counter = 1
-
-        for i in range(
-            19, 27
-        ):  # these numbers set the length range for potential primers you want to evaluate.
-
-            forward_sequence = row["sequence"][:i]
-            forward_options.append(
-                (
-                    row["amplicon name"],
-                    forward_name,
-                    "forward",
-                    option_group_idx_counter,
-                    forward_sequence,
-                )
-            )
-
-            last_N = Seq(row["sequence"][-i:])
-            # Use Biopython to get the reverse complement of gene end
-            reverse_sequence = str(last_N.reverse_complement())
-            reverse_options.append(
-                (
-                    row["amplicon name"],
-                    reverse_name,
-                    "reverse",
-                    option_group_idx_counter,
-                    reverse_sequence,
-                )
-            )
-
-            option_group_idx_counter += 1
-
-        options_tuples_list.extend(forward_options)
-        options_tuples_list.extend(reverse_options)
+    # for each amplicon list of possible forward & reverse primers b/w 19-26 bp,
+    # built with comprehensions over itertuples - avoids the per-row Series
+    # construction of iterrows and the per-option list.append calls
+
+    # reverse complement each full sequence once, then slice prefixes for each length
+    amplicon_rows = [
+        (name, sequence, sequence.encode("ascii").translate(RC_TRANSLATION)[::-1])
+        for name, sequence in unique_input_df[
+            ["amplicon name", "sequence"]
+        ].itertuples(index=False, name=None)
+    ]
+
+    # these numbers set the length range for potential primers you want to evaluate
+    primer_length_range = range(19, 27)
+
+    forward_options = [
+        (name, f"{name} forward", "forward", i - 18, sequence[:i])
+        for name, sequence, _ in amplicon_rows
+        for i in primer_length_range
+    ]
+    reverse_options = [
+        (
+            name,
+            f"{name} reverse",
+            "reverse",
+            i - 18,
+            reverse_complement[:i].decode("ascii"),
+        )
+        for name, _, reverse_complement in amplicon_rows
+        for i in primer_length_range
+    ]
+    options_tuples_list = forward_options + reverse_options
 
     primer_options_df = pd.DataFrame(
         options_tuples_list,
@@ -215,100 +202,125 @@ def generate_primers(
         ],
     )
 
-    scored_primer_option_row_list = []
-    for index, row in primer_options_df.iterrows():
-
-        # check for GC clamp & add GC binary score
-        if row["primer_sequence"][-1:] in ["G", "C"]:
-            row["gc_clamp"] = 1
-        else:
-            row["gc_clamp"] = 0
-
-        # add length
-        row["length"] = len(row["primer_sequence"])
-
-        # calculate & add GC%
-        nG, nC = row["primer_sequence"].count("G"), row["primer_sequence"].count("C")
-        row["gc_percentage"] = round(
-            (nG + nC) / float(row["length"]) * 100, 2
-        )  # convert to float to avoid int division
+    # compact dtypes - the name & direction columns repeat heavily, so
+    # categoricals (and narrow ints below) halve memory and speed up the
+    # groupby/sort paths, which hash integer category codes instead of strings
+    primer_options_df = primer_options_df.astype(
+        {
+            "amplicon_name": "category",
+            "primer_name": "category",
+            "direction": "category",
+            "option_group_index": "int8",
+        }
+    )
 
-        # calculate & add Melt Temperature (Tm)
-        row["melt_temperature"] = tm_calc(row["primer_sequence"])
+    # score all candidates at once with vectorized column operations
+    sequences = primer_options_df["primer_sequence"]
+
+    # encode every candidate into one padded base-code matrix (rows
+    # right-padded with A, which never counts toward GC), so GC% and the GC
+    # clamp come from a single C-level pass over a contiguous buffer instead
+    # of separate pandas string scans per metric
+    lengths = sequences.str.len().to_numpy()
+    codes = np.zeros((len(sequences), lengths.max()), dtype=np.uint8)
+    in_sequence = np.arange(lengths.max()) < lengths[:, None]
+    flat_codes = BASE_CODE_LUT[
+        np.frombuffer("".join(sequences).encode("ascii"), dtype=np.uint8)
+    ]
+    # inputs are validated upstream, so the sentinel only appears for direct
+    # callers passing ambiguous bases - fail loudly rather than counting them as A
+    assert (
+        flat_codes != NON_ACGT_SENTINEL
+    ).all(), "sequences must contain only A/C/G/T bases"
+    codes[in_sequence] = flat_codes
+
+    # GC bases encode to 1 (C) and 2 (G) under BASE_CODE_LUT
+    is_gc = (codes == 1) | (codes == 2)
+
+    # check for GC clamp & add GC binary score
+    last_base_codes = codes[np.arange(len(sequences)), lengths - 1]
+    primer_options_df["gc_clamp"] = (
+        (last_base_codes == 1) | (last_base_codes == 2)
+    ).astype("int8")
+
+    # add length
+    primer_options_df["length"] = lengths.astype("int8")
+
+    # calculate & add GC%
+    primer_options_df["gc_percentage"] = (
+        (is_gc.sum(axis=1) / lengths * 100).round(2).astype("float32")
+    )
 
-        # Calculate raw scores for Tm (targeting 62 C) and GC% (targeting 50%)
-        row["melt_temp_target_distance"] = abs(62 - row["melt_temperature"])
-        row["gc_percentage_target_distance"] = abs(50 - row["gc_percentage"])
+    # calculate & add Melt Temperature (Tm)
+    primer_options_df["melt_temperature"] = sequences.map(tm_calc).astype("float32")
 
-        scored_primer_option_row_list.append(row)
+    # Calculate raw scores for Tm (targeting 62 C) and GC% (targeting 50%)
+    primer_options_df["melt_temp_target_distance"] = (
+        62 - primer_options_df["melt_temperature"]
+    ).abs()
+    primer_options_df["gc_percentage_target_distance"] = (
+        50 - primer_options_df["gc_percentage"]
+    ).abs()
 
-    raw_score_df = pd.DataFrame(scored_primer_option_row_list)
+    raw_score_df = primer_options_df
 
-    #
+    # normalize target distances against the worst option within each primer group
     primer_group = raw_score_df.groupby("primer_name")
+    max_melt_temp_target_distance = primer_group["melt_temp_target_distance"].transform(
+        "max"
+    )
+    max_gc_percent_target_distance = primer_group[
+        "gc_percentage_target_distance"
+    ].transform("max")
+
+    # Ensure that divisor won't be 0
+    assert (max_melt_temp_target_distance != 0).all()
+    assert (
+        max_gc_percent_target_distance != 0
+    ).all()  # failure here means that all options had exactly 50% GC - not possible
+
+    raw_score_df["melt_temperature_score"] = 1 - (
+        raw_score_df["melt_temp_target_distance"] / max_melt_temp_target_distance
+    )
+    raw_score_df["gc_percentage_score"] = 1 - (
+        raw_score_df["gc_percentage_target_distance"] / max_gc_percent_target_distance
+    )
 
-    total_score_row_list = []
-    for primer_name, primer_group_df in primer_group:
-        max_melt_temp_target_distance = primer_group_df[
-            "melt_temp_target_distance"
-        ].max()
-        max_gc_percent_target_distance = primer_group_df[
-            "gc_percentage_target_distance"
-        ].max()
-
-        # Ensure that divisor won't be 0
-        assert max_melt_temp_target_distance != 0
-        assert (
-            max_gc_percent_target_distance != 0
-        )  # failure here means that all options had exactly 50% GC - not possible
-
-        for index, row in primer_group_df.iterrows():
-            row["melt_temperature_score"] = 1 - (
-                row["melt_temp_target_distance"] / max_melt_temp_target_distance
-            )
-            row["gc_percentage_score"] = 1 - (
-                row["gc_percentage_target_distance"] / max_gc_percent_target_distance
-            )
-
-            # calculate total score by adding normalized scores and GC clamp point. Currently weighting Tm Score 2X
-            row["total_score"] = (
-                row["gc_clamp"]
-                + 2 * row["melt_temperature_score"]
-                + row["gc_percentage_score"]
-            )
-
-            # add completed row to list for final dataframe
-            total_score_row_list.append(row)
-
-    total_score_df = pd.DataFrame(total_score_row_list)
+    # calculate total score by adding normalized scores and GC clamp point. Currently weighting Tm Score 2X
+    raw_score_df["total_score"] = (
+        raw_score_df["gc_clamp"]
+        + 2 * raw_score_df["melt_temperature_score"]
+        + raw_score_df["gc_percentage_score"]
+    )
 
     # Add rank by total score for each option within each primer group
-    scored_primer_group = total_score_df.groupby("primer_name")
+    raw_score_df["option_group_rank"] = (
+        raw_score_df.groupby("primer_name")["total_score"]
+        .rank(method="first", ascending=False)
+        .astype(int)
+    )
+
+    all_options_ranked_df = raw_score_df.sort_values(
+        ["primer_name", "option_group_rank"], ignore_index=True
+    )
 
-    final_rank_df_list = []
-    for scored_primer_name, scored_primer_group_df in scored_primer_group:
-        sorted_total_score_series = scored_primer_group_df["total_score"].sort_values(
-            ascending=False, ignore_index=True
+    # pick the best option per primer group directly via idxmax - the first
+    # occurrence wins on ties, matching rank(method="first") == 1
+    best_option_idx = raw_score_df.groupby("primer_name")["total_score"].idxmax()
+    optimal_primer_results_df = raw_score_df.loc[best_option_idx].reset_index(drop=True)
+
+    # map results scored on distinct sequences back onto every submitted
+    # amplicon, relabeling rows for the duplicates with their own names
+    if len(unique_input_df) < len(input_df):
+        representative_names = dict(
+            zip(unique_input_df["sequence"], unique_input_df["amplicon name"])
         )
-        total_score_rank_df = sorted_total_score_series.to_frame(
-            name="total_score"
-        ).reset_index(names="option_group_rank")
-        total_score_rank_df["option_group_rank"] = (
-            total_score_rank_df["option_group_rank"] + 1
+        all_options_ranked_df = expand_duplicate_amplicons(
+            all_options_ranked_df, input_df, representative_names
         )
-        primer_group_final_rank_df = scored_primer_group_df.merge(
-            total_score_rank_df, on="total_score"
+        optimal_primer_results_df = expand_duplicate_amplicons(
+            optimal_primer_results_df, input_df, representative_names
         )
-        final_rank_df_list.append(primer_group_final_rank_df)
-
-    all_options_ranked_df = pd.concat(final_rank_df_list)
-    all_options_ranked_df.reset_index(drop=True, inplace=True)
-
-    # subset all Rank #1 options into final results dataframe
-    optimal_primer_results_df = all_options_ranked_df[
-        all_options_ranked_df["option_group_rank"] == 1
-    ]
-    optimal_primer_results_df.reset_index(drop=True, inplace=True)
 
     if add_overhangs:
         forward_results = optimal_primer_results_df[
@@ -324,7 +336,6 @@ def generate_primers(
         reverse_results["primer_sequence"] = (
             downstream_overhang + reverse_results["primer_sequence"]
         )
-        print("Overhangs Added")
         optimal_primer_results_df = pd.concat(
             [forward_results, reverse_results]
         ).sort_index()
@@ -349,21 +360,43 @@ def process_csv(file_object_in):
     Notes:
     - Contains try/except blocks to run input validity checks
     """
-    content = file_object_in.read().decode("utf-8")
-    input_df = pd.read_csv(StringIO(content))
+    # hand the raw byte stream straight to the parser (PyArrow when
+    # installed, the C engine otherwise), which decodes in-place - avoids
+    # materializing the full decoded string in memory
+    input_df = pd.read_csv(file_object_in, encoding="utf-8", **CSV_READ_KWARGS)
+
+    # convert column headers to lowercase to avoid case sensitivity errors
+    input_df.columns = map(str.lower, input_df.columns)
 
     # check that input_df meets assumptions
 
-    # check input columns match expected
-    try:
-        expected_columns = ["amplicon name", "sequence"]
-        for col in list(input_df.columns):
-            assert col in expected_columns
-    except:
-        error_message_str = f"Exptected columns {expected_columns}, but {list(input_df.columns)} detected"
+    # check input columns match expected - a single set comparison catches
+    # both missing and unexpected columns
+    expected_columns = {"amplicon name", "sequence"}
+    detected_columns = set(input_df.columns)
+    if detected_columns != expected_columns:
+        error_message_str = f"Exptected columns {sorted(expected_columns)}, but {sorted(detected_columns)} detected"
         # If assumption not met, return input_valid as False,
-        # error message in place of input_df, and output_df as None
-        return False, error_message_str, None
+        # error message in place of input_df, and output dfs as None
+        return False, error_message_str, None, None
+
+    # check sequences contain only unambiguous A/C/G/T bases - the scoring
+    # lookup tables have no entries for ambiguity codes like N
+    cleaned_sequences = (
+        input_df["sequence"]
+        .str.strip()
+        .str.replace("\n", "")
+        .str.replace("\r", "")
+        .str.upper()
+    )
+    valid_sequences = cleaned_sequences.str.fullmatch("[ACGT]+").fillna(False)
+    if not valid_sequences.all():
+        invalid_names = list(input_df["amplicon name"][~valid_sequences])
+        error_message_str = (
+            f"Exptected sequences containing only A/C/G/T bases, "
+            f"but amplicons {invalid_names} contain other characters"
+        )
+        return False, error_message_str, None, None
 
     # TODO: add more input validation checks
 